@@ -0,0 +1,56 @@
+CREATE TABLE test_4 (
+  id INT NOT NULL,
+  name TEXT NOT NULL
+);
+
+create index test_4 (name);
+
+insert into test_4 (id, name) values (1, 'x');
+insert into test_4 (id, name) values (2, 'x');
+insert into test_4 (id, name) values (3, 'x');
+insert into test_4 (id, name) values (4, 'x');
+insert into test_4 (id, name) values (5, 'x');
+insert into test_4 (id, name) values (6, 'x');
+insert into test_4 (id, name) values (7, 'x');
+insert into test_4 (id, name) values (8, 'x');
+insert into test_4 (id, name) values (9, 'x');
+insert into test_4 (id, name) values (10, 'x');
+insert into test_4 (id, name) values (11, 'x');
+insert into test_4 (id, name) values (12, 'x');
+insert into test_4 (id, name) values (13, 'x');
+insert into test_4 (id, name) values (14, 'x');
+insert into test_4 (id, name) values (15, 'x');
+insert into test_4 (id, name) values (16, 'x');
+insert into test_4 (id, name) values (17, 'x');
+insert into test_4 (id, name) values (18, 'x');
+insert into test_4 (id, name) values (19, 'x');
+insert into test_4 (id, name) values (20, 'x');
+insert into test_4 (id, name) values (21, 'x');
+insert into test_4 (id, name) values (22, 'x');
+insert into test_4 (id, name) values (23, 'x');
+insert into test_4 (id, name) values (24, 'x');
+insert into test_4 (id, name) values (25, 'x');
+insert into test_4 (id, name) values (26, 'x');
+insert into test_4 (id, name) values (27, 'x');
+insert into test_4 (id, name) values (28, 'x');
+insert into test_4 (id, name) values (29, 'x');
+insert into test_4 (id, name) values (30, 'x');
+insert into test_4 (id, name) values (31, 'x');
+insert into test_4 (id, name) values (32, 'x');
+insert into test_4 (id, name) values (33, 'x');
+insert into test_4 (id, name) values (34, 'x');
+insert into test_4 (id, name) values (35, 'x');
+insert into test_4 (id, name) values (36, 'x');
+insert into test_4 (id, name) values (37, 'x');
+insert into test_4 (id, name) values (38, 'x');
+insert into test_4 (id, name) values (39, 'x');
+insert into test_4 (id, name) values (40, 'x');
+
+-- Every row goes through the index on name, and each move to a new rowid
+-- changes that same index while it is being searched
+UPDATE test_4 SET name = 'yyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyy' WHERE name = 'x';
+
+-- Won't select anything
+SELECT * FROM test_4 WHERE name = 'x';
+
+SELECT * FROM test_4;
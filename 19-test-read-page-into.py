@@ -0,0 +1,36 @@
+from file import *
+from file.table import TableFile
+from file.paging import INVALID_OFF
+from file.valuetype import Float32
+
+types = [vt.SMALLINT, vt.TEXT, vt.FLOAT, vt.TINYINT]
+
+#Tag ID     Name     Weight(kg)    Age (years)
+data = ((933,   b'Rover',   Float32(20.6), 4),
+        (8326,  b'Spot',    Float32(10.8), 7),
+        (5359,  b'Lucky',   Float32(31.2), 5),
+        (10355, b'Dinky',   Float32(4.8),  11),
+        (7757,  b'Bruiser', Float32(42.0), 6), 
+        (3597,  b'Patch',   Float32(29.6), 9), 
+        (202,   b'Prince',  Float32(16.6), 7), 
+        (1630,  b'Bubbles', Float32(7.1),  11),
+        (1223,  b'Peanut',  Float32(14.3), 2))
+
+dbfile = TableFile(open('dogs.tbl', 'w+b'), types, 128, last_rowid = 0, 
+        root_page = INVALID_OFF)
+for i in range(3):
+    for tup in data:
+        dbfile.add(tup)
+
+# Reading every page into the same Page object should give the same pages as
+# read_page does
+p = None
+for j in range(dbfile.next_page()):
+    reused = dbfile.read_page_into(j, p)
+    assert p is None or reused is p
+    p = reused
+    print(p.display_short())
+    assert repr(p) == repr(dbfile.read_page(j))
+
+print(f'Root page is {dbfile.calc_root()}')
+dbfile.close()
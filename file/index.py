@@ -1,5 +1,6 @@
 from .base import FileFormatError, require_params
-from .paging import create_cell, Page, PageTypes as pt, PagingFile, INVALID_OFF
+from .paging import create_cell, Page, PageTypes as pt, PagingFile, \
+        INVALID_OFF, batched
 from functools import lru_cache
 
 class IndexNode(object):
@@ -160,7 +161,7 @@ class IndexNode(object):
         if inequality == '=':
             for icell in cells:
                 if icell.key == key:
-                    return icell.rowids
+                    return list(icell.rowids)
                 elif key < icell.key:
                     if p.type == pt.IndexLeaf:
                         return []
@@ -357,6 +358,7 @@ class IndexFile(PagingFile):
         self.write_page(page)
         return IndexNode(self, page)
 
+    @batched
     def add(self, rowid, keyv):
         '''Adds an element. If there is not a root node, it is created. Overflows are handled recursively.'''
 
@@ -387,7 +389,7 @@ class IndexFile(PagingFile):
     
     def clear(self):
         IndexFile._fetch_node.cache_clear()
-        self.file.truncate(0)
+        self.truncate()
         self.__root = None
 
     def search(self,key,inequality):
@@ -398,6 +400,7 @@ class IndexFile(PagingFile):
         else:
             return []
     
+    @batched
     def delete(self,rowid,key):
         '''Deletes the rowid, key combination'''
         if self.__root != None:
@@ -405,6 +408,7 @@ class IndexFile(PagingFile):
         else:
             return False
     
+    @batched
     def modify(self,old_rowid,new_rowid,key):
         '''Modifys the rowid at key to a new rowid'''
         if self.__root != None:
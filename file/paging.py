@@ -1,10 +1,18 @@
 import enum
+import operator
+import os
 import struct
+from array import array
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+from functools import lru_cache, wraps
+from sortedcontainers import SortedSet
 from .base import FileFormatError, require_params
-from .valuetype import vpack1, vpack, vunpack, vunpack1_from, \
-    check_type_compat, ValueType as vt, NULLVAL
+from .valuetype import vpack1, vpack, vunpack, vunpack1_from, vunpack_column, \
+    check_type_compat, check_types_compat, ValueType as vt, NULLVAL
 
-__all__ = ['PageTypes', 'Page', 'PagingFile', 'create_cell', 'INVALID_OFF']
+__all__ = ['PageTypes', 'Page', 'PagingFile', 'batched', 'create_cell',
+        'INVALID_OFF']
 
 class PageTypes(enum.IntEnum):
     IndexInterior = 2
@@ -15,8 +23,30 @@ class PageTypes(enum.IntEnum):
 s_page_header = struct.Struct('>BxHHIIxx')
 s_page_offs = struct.Struct('>H')
 
+@lru_cache(None)
+def s_page_offsn(ncells):
+    ''' Obtains the (cached) struct used to pack/unpack an array of ncells cell
+    offsets, so that the format does not have to be recompiled every time '''
+    return struct.Struct(f'>{ncells}H')
+
+@lru_cache(None)
+def s_rowidsn(nrows):
+    ''' Obtains the (cached) struct used to pack/unpack the nrows row IDs held
+    by an index cell '''
+    return struct.Struct(f'>{nrows}I')
+
 INVALID_OFF = 0xffffffff
 
+def _iov_max():
+    ''' Max number of buffers that can be given to a single pwritev '''
+    try:
+        iov_max = os.sysconf('SC_IOV_MAX')
+    except (AttributeError, ValueError, OSError):
+        iov_max = -1
+    return iov_max if iov_max > 0 else 16
+
+IOV_MAX = _iov_max()
+
 class DataCell(object):
     ''' Abstract superclass representing a data cell within a page block. This
     contains only the attributes (and perhaps attributes of its subclasss also)
@@ -37,7 +67,9 @@ class DataCell(object):
         raise NotImplementedError('Abstract method')
 
     def load_payload(self, payload):
-        ''' Loads the payload part of this cell into the cell '''
+        ''' Loads the payload part of this cell into the cell. The payload is
+        usually a memoryview into the page buffer, so it must not be kept 
+        around after this returns. '''
         raise NotImplementedError('Abstract method')
 
     def store_payload(self):
@@ -45,25 +77,27 @@ class DataCell(object):
         raise NotImplementedError('Abstract method')
         
 class IndexLeafCell(DataCell):
-    ''' This is a leaf cell of an index b tree '''
+    ''' This is a leaf cell of an index b tree. The row IDs are kept as a sorted
+    set, so that they are always stored in the same (ascending) order. '''
 
     __slots__ = ['rowids', 'key']
     _head = struct.Struct('>0sH0s')
     def __init__(self, *params, **kparams):
-        self.rowids = []
+        self.rowids = ()
         self.key = b''
         super().__init__(*params, **kparams)
+        self.rowids = SortedSet(self.rowids)
         if len(self.tuple_types) != 1:
             raise FileFormatError('Mismatch size of tuple length')
 
     def __str__(self):
-        return repr(self.key) + ' ' + repr(self.rowids)
+        return repr(self.key) + ' ' + repr(list(self.rowids))
 
     def display(self, tablevel = 0):
         tb = '  ' * tablevel
         return f'{tb}IndexLeafCell {{\n' + \
                 f'{tb}  key: {repr(self.key)}\n' + \
-                f'{tb}  rowids: {repr(self.rowids)}\n' + \
+                f'{tb}  rowids: {repr(list(self.rowids))}\n' + \
                 f'{tb}}}'
 
     def load_payload(self, payload):
@@ -76,8 +110,8 @@ class IndexLeafCell(DataCell):
         if len(payload) != key_size + 1 + 4 * nids:
             raise FileFormatError('Invalid payload size')
 
-        self.rowids = set(x for x, in struct.iter_unpack('>I', 
-            payload[key_size + 1:]))
+        self.rowids = SortedSet(s_rowidsn(nids).unpack_from(payload,
+            key_size + 1))
 
     def store_payload(self):
         nrows = len(self.rowids)
@@ -88,8 +122,7 @@ class IndexLeafCell(DataCell):
             keypack = vpack1(vt.NULL, self.key)
         else:
             keypack = vpack1(self.tuple_types[0], self.key)
-        return bytes([nrows]) + keypack + \
-                struct.pack('>' + 'I' * nrows, *self.rowids)
+        return bytes([nrows]) + keypack + s_rowidsn(nrows).pack(*self.rowids)
 
 class TableLeafCell(DataCell):
     ''' This is a leaf cell of a table b+ tree '''
@@ -113,10 +146,7 @@ class TableLeafCell(DataCell):
 
     def load_payload(self, payload):
         tuples = vunpack(payload)
-        if len(tuples) != len(self.tuple_types):
-            raise FileFormatError('Mismatch tuple sizes')
-        for exp, act in zip(self.tuple_types, list(payload[1:1 + len(tuples)])):
-            check_type_compat(exp, act)
+        check_types_compat(self.tuple_types, bytes(payload[1:1 + len(tuples)]))
         self.tuples = tuples
 
     def store_payload(self):
@@ -143,7 +173,7 @@ class IndexInteriorCell(IndexLeafCell):
         return f'{tb}IndexInteriorCell {{\n' + \
                 f'{tb}  left_child: {hex(self.left_child)}\n' + \
                 f'{tb}  key: {repr(self.key)}\n' + \
-                f'{tb}  rowids: {repr(self.rowids)}\n' + \
+                f'{tb}  rowids: {repr(list(self.rowids))}\n' + \
                 f'{tb}}}'
 
 class TableInteriorCell(DataCell):
@@ -181,29 +211,91 @@ _cells = {
 def create_cell(ptype, *params, **kparams):
     return _cells[ptype](*params, **kparams)
 
-def null(tup):
-    ret = []
-    for t in tup:
-        if t == b'':
-            t = None
-        ret.append(t)
-    return tuple(ret)
-
-def unnull(tup):
-    ret = []
-    for t in tup:
-        if t == None:
-            t = b''
-        ret.append(t)
-    return tuple(ret)
+def _make_cell_codec(cell_type, has_left, has_payload, has_rowid):
+    ''' Builds the (unpack_cells, pack_cell) implementations for pages holding
+    cells of cell_type, given which of the three cell header fields this cell
+    type actually has. Fields a cell type does not have are packed as b'' (a
+    "0s" field in its header struct). Since the layout is fixed per page type,
+    it is resolved here once, instead of being checked for every cell. '''
+
+    head = cell_type._head
+    head_size = head.size
+    unpack_head = head.unpack_from
+    pack_head = head.pack
+    pack_head_into = head.pack_into
+
+    def unpack_cells(page, buff, offsets):
+        tuple_types = page.tuple_types
+        buff_size = len(buff)
+
+        cells = []
+        sizes = []
+        for offset in offsets:
+            left_child, payload_size, rowid = unpack_head(buff, offset)
+            cell = cell_type(tuple_types,
+                    left_child = left_child if has_left else None,
+                    rowid = rowid if has_rowid else None)
+            if has_payload:
+                if payload_size == 0:
+                    raise FileFormatError('Invalid payload size')
+                poff = offset + head_size
+                if payload_size + poff > buff_size:
+                    raise FileFormatError('Invalid payload size')
+                cell.load_payload(buff[poff:poff + payload_size])
+                sizes.append(head_size + payload_size)
+            else:
+                sizes.append(head_size)
+            cells.append(cell)
+
+        return cells, sizes
+
+    def store_payload(cell):
+        if type(cell) is not cell_type:
+            raise FileFormatError(f'Expected a cell type of {cell_type}, ' + \
+                    f'got {type(cell)}')
+        return cell.store_payload() if has_payload else b''
+
+    def pack_cell(page, cell):
+        payload = store_payload(cell)
+        return pack_head(cell.left_child if has_left else b'',
+                len(payload) if has_payload else b'',
+                cell.rowid if has_rowid else b'') + payload
+
+    def pack_cell_into(page, cell, buff, start, end):
+        payload = store_payload(cell)
+        offset = end - head_size - len(payload)
+        if offset < start:
+            raise FileFormatError('Overflow of cells')
+
+        pack_head_into(buff, offset, cell.left_child if has_left else b'',
+                len(payload) if has_payload else b'',
+                cell.rowid if has_rowid else b'')
+        buff[offset + head_size:end] = payload
+        return offset
+
+    def cell_size(page, cell):
+        return head_size + len(store_payload(cell))
+
+    return unpack_cells, pack_cell, pack_cell_into, cell_size
+
+_cell_codecs = {
+        PageTypes.TableLeaf: _make_cell_codec(TableLeafCell,
+            has_left = False, has_payload = True, has_rowid = True),
+        PageTypes.IndexLeaf: _make_cell_codec(IndexLeafCell,
+            has_left = False, has_payload = True, has_rowid = False),
+        PageTypes.TableInterior: _make_cell_codec(TableInteriorCell,
+            has_left = True, has_payload = False, has_rowid = True),
+        PageTypes.IndexInterior: _make_cell_codec(IndexInteriorCell,
+            has_left = True, has_payload = True, has_rowid = False),
+    }
 
 class Page(object):
     ''' This is a page object that represents a page within an index or table
     file. This contains only the attributes of such a page, and not the actual
     bytes itself (to allow for easy updating). '''
 
-    __slots__ = ['dbfile', 'cur_pnum', '_type', 'pnum_right', 'pnum_parent',
-            'cells', 'tuple_types']
+    __slots__ = ['dbfile', 'cur_pnum', '_type', '_unpack_impl', '_pack_impl',
+            '_pack_into_impl', '_size_impl', 'pnum_right', 'pnum_parent', 'cells', 'tuple_types', '_rowid_keys']
 
     @staticmethod
     def get_page_header_size():
@@ -214,10 +306,23 @@ class Page(object):
         self.dbfile = dbfile
         self.cur_pnum = pagenum
         self.type = ptype
-        self.tuple_types = tuple_types
+        self.tuple_types = tuple(tuple_types)
         self.pnum_right = pnum_right & 0xffffffff
         self.pnum_parent = pnum_parent & 0xffffffff
         self.cells = list(cells)
+        self._rowid_keys = None
+
+    def reset(self, pagenum, ptype, pnum_right, pnum_parent):
+        ''' Reinitializes this page object in place, as if it were newly created
+        (with no cells) for the given page number. This allows a single Page
+        object to be reused for reading many pages, see
+        PagingFile.read_page_into '''
+        self.cur_pnum = pagenum
+        self.type = ptype
+        self.pnum_right = pnum_right & 0xffffffff
+        self.pnum_parent = pnum_parent & 0xffffffff
+        self.cells.clear()
+        self._rowid_keys = None
 
     def __str__(self):
         return f'Page({self.type})'
@@ -229,6 +334,10 @@ class Page(object):
         return self._type
     def _set_type(self, newtype):
         self._type = PageTypes(newtype)
+        # Install the cell codec specialized for this page type, so that this
+        # is not dispatched for every cell
+        self._unpack_impl, self._pack_impl, self._pack_into_impl, \
+                self._size_impl = _cell_codecs[self._type]
     type = property(_get_type, _set_type)
 
     @property
@@ -255,21 +364,37 @@ class Page(object):
                 f'{tb} cells: [{cells}]\n{tb}}}'
 
 
+    def rowid_keys(self):
+        ''' Obtains the rowids of the cells in this page as one contiguous array,
+        so that table pages can be binary searched by rowid. This is built
+        lazily, and kept until invalidate_rowid_keys is called. '''
+        keys = self._rowid_keys
+        if keys is None:
+            keys = self._rowid_keys = array('I', [c.rowid for c in self.cells])
+        return keys
+
+    def invalidate_rowid_keys(self):
+        ''' Drops the array built by rowid_keys. This MUST be called whenever
+        cells are added to or removed from this page, or the rowid of a cell is
+        changed (write_page also calls this). '''
+        self._rowid_keys = None
+
     def get_cell_size(self, cell):
         ''' Computes the total amount of space this cell would take if it were
         packed into this page. It specifically accounts for both the offset
         bytes and the actual cell data '''
 
-        return len(self.pack_cell(cell)) + 2 
+        return self._size_impl(self, cell) + 2 
 
     def get_used_size(self):
         ''' Obtains the amount of bytes used for cell data. '''
-        return sum(len(self.pack_cell(c)) for c in self.cells)
+        size = self._size_impl
+        return sum(size(self, c) for c in self.cells)
 
     def get_free_size(self):
         ''' Obtains the amount of bytes left in this page that we can use to put
         more cell data. '''
-        cells_len = sum(len(self.pack_cell(c)) for c in self.cells)
+        cells_len = self.get_used_size()
         head_len = Page.get_page_header_size() + len(self.cells) * 2
         return self.page_size - (cells_len + head_len)
 
@@ -277,28 +402,21 @@ class Page(object):
         ''' Unpacks byte data from an offset to a cell object exposing its
         attributes. This page will not automatically add it to itself, but if
         this should be added, the user can simply modify the array field "cells"
-        that is exposed from this object. '''
-
-        cell_type = _cells[self.type]
-        head = cell_type._head
-        left_child, payload_size, rowid = null(head.unpack_from(buff, offset))
+        that is exposed from this object. 
+        
+        The payload is handed to the cell as a memoryview slice of buff (if buff
+        is a memoryview itself), so no per-cell copy is made. '''
 
-        if payload_size == 0:
-            raise FileFormatError('Invalid payload size')
+        cells, sizes = self.unpack_cells(buff, (offset,))
+        return (cells[0], sizes[0])
 
-        if payload_size:
-            poff = offset + head.size
-            if payload_size + poff > len(buff):
-                raise FileFormatError('Invalid payload size')
-            payload = buff[poff:poff + payload_size]
-        else:
-            payload_size = 0
-            payload = None
+    def unpack_cells(self, buff, offsets):
+        ''' Unpacks the cells at each of the offsets within buff, exactly as
+        unpack_cell_from does. This runs as one loop over all the cells of a
+        page, with everything that is the same for each cell looked up only
+        once. Returns the list of cells and the list of their sizes. '''
 
-        cell = cell_type(self.tuple_types, left_child = left_child, 
-                rowid = rowid)
-        if payload: cell.load_payload(payload)
-        return (cell, payload_size + head.size)
+        return self._unpack_impl(self, buff, offsets)
 
     def pack_cell(self, cell):
         ''' This will pack a cell according to the type specs of this page
@@ -308,44 +426,143 @@ class Page(object):
         A FileFormatError is raised if the cell attributes being packed violates
         the file format expected '''
 
-        cell_type = _cells[self.type]
-        if cell_type != type(cell):
-            raise FileFormatError(f'Expected a cell type of {cell_type}, ' + \
-                    f'got {type(cell)}')
-        head = cell_type._head
-
-        payload = cell.store_payload()
-        payload_size = None
-        if payload:
-            payload_size = len(payload)
-
-        return head.pack(*unnull([cell.left_child, payload_size, 
-            cell.rowid])) + payload
-
-def readn(file, size):
-    read = data = file.read(size)
-    while len(data) != size:
+        return self._pack_impl(self, cell)
+
+    def pack_cell_into(self, cell, buff, start, end):
+        ''' Packs a cell, just as pack_cell does, but directly into buff so that
+        it ends right at offset end, without building the cell bytes first.
+        Returns the offset the cell starts at, which has to be at least start,
+        otherwise a FileFormatError is raised since the cell does not fit. '''
+
+        return self._pack_into_impl(self, cell, buff, start, end)
+
+PageHeader = namedtuple('PageHeader', ['ptype', 'ncells', 'poff_start',
+    'pnum_right', 'pnum_parent', 'cell_off_end'])
+
+def parse_page_header(page):
+    ''' Unpacks the header of a (whole) page and checks it against the file
+    format, all in one go. Returns a PageHeader, which also includes the end
+    offset of the cell offsets array (cell_off_end). 
+    
+    This will raise a FileFormatError if the header is invalid. '''
+
+    ptype, ncells, poff_start, pnum_right, pnum_parent = \
+            s_page_header.unpack_from(page)
+    if poff_start == 0:
+        poff_start = 0x10000
+
+    # File-format checking
+    if ptype not in _cells:
+        raise FileFormatError(f'Invalid page type: 0x{ptype:x}')
+
+    # Make sure our data chunks do not overlap
+    cell_off_end = s_page_header.size + ncells * s_page_offs.size
+    if cell_off_end >= len(page):
+        raise FileFormatError(f'Invalid number of cells (0x{cell_off_end:x})')
+
+    if poff_start < cell_off_end:
+        raise FileFormatError(f'Invalid start offset (0x{poff_start:x})')
+
+    return PageHeader(ptype, ncells, poff_start, pnum_right, pnum_parent,
+            cell_off_end)
+
+def check_cell_extents(page, offsets, sizes):
+    ''' Makes sure that the cells at the given offsets (with the given sizes) do
+    not overlap each other or run past the end of the page. Done in bulk over
+    the cell extents sorted by offset. Raises a FileFormatError otherwise. '''
+    if not offsets:
+        return
+
+    starts, sizes = zip(*sorted(zip(offsets, sizes)))
+    ends = list(map(operator.add, starts, sizes))
+    if ends[-1] > len(page) or not all(map(operator.le, ends, starts[1:])):
+        raise FileFormatError(f'Overlapping cells or bad offset')
+
+def readn_into(fd, buf, offset):
+    ''' Reads exactly len(buf) bytes at offset from the file descriptor into the
+    (writable) buffer buf. This uses positional reads, so it never touches (or
+    races on) the file position. '''
+    view = memoryview(buf)
+    while view:
+        read = _pread_into(fd, view, offset)
         if not read:
             raise FileFormatError('Short read')
-        read = file.read(size - len(data))
-        data += read
-
-    return data
+        view = view[read:]
+        offset += read
+
+def _pread_into(fd, view, offset):
+    ''' Reads up to len(view) bytes at offset straight into view. Where
+    os.preadv is not available (e.g. macOS before Python 3.10), this falls back
+    to os.pread, copying the data in. Returns the number of bytes read. '''
+    if hasattr(os, 'preadv'):
+        return os.preadv(fd, [view], offset)
+
+    data = os.pread(fd, len(view), offset)
+    view[:len(data)] = data
+    return len(data)
+
+def writen(fd, data, offset):
+    ''' Writes all of data at offset into the file descriptor, using positional
+    writes. '''
+    data = memoryview(data)
+    while data:
+        written = os.pwrite(fd, data, offset)
+        data = data[written:]
+        offset += written
+
+def writevn(fd, bufs, offset):
+    ''' Writes all of the buffers back to back at offset, using one gathering
+    positional write (and falling back to writen for what is left on a short
+    write). Where os.pwritev is not available, the buffers are joined and
+    written with writen instead. '''
+    if not hasattr(os, 'pwritev'):
+        writen(fd, b''.join(bufs), offset)
+        return
+
+    written = os.pwritev(fd, bufs, offset)
+    total = sum(map(len, bufs))
+    if written < total:
+        writen(fd, memoryview(b''.join(bufs))[written:], offset + written)
+
+def batched(method):
+    ''' Decorator for methods of a PagingFile (subclass) that makes all the
+    pages written by the method be written out as one batch when it returns.
+    '''
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.batch():
+            return method(self, *args, **kwargs)
+    return wrapper
 
 class PagingFile(object):
     ''' Represents a paginated B-tree like structure that lays out key and
     value pairs within a searchable paging system. '''
 
-    def __init__(self, file, tuple_types, page_size = 512):
-        ''' Create paging DB file from a specific file. '''
+    def __init__(self, file, tuple_types, page_size = 512, cache_size = 128):
+        ''' Create paging DB file from a specific file. All page I/O is done
+        with positional reads/writes on the underlying file descriptor, so the
+        file object itself is only used for its descriptor and for truncating/
+        closing the file. 
+        
+        Up to cache_size of the most recently used pages are kept parsed in
+        memory (a buffer pool), so that repeatedly reading the same page does
+        not hit the disk nor re-parse the page. '''
         if type(file) in (str, bytes):
             try:
                 file = open(file, 'rb+')
             except:
                 file = open(file, 'xb+')
         self.__file = file
+        self.__fd = file.fileno()
         self.__page_size = page_size
-        self.__tuple_types = tuple_types
+        # Shared (immutable) by all pages and cells of this file
+        self.__tuple_types = tuple(tuple_types)
+        self.__cache = OrderedDict()
+        self.__cache_size = cache_size
+        self.__dirty = {}
+        self.__batch_depth = 0
+        # Reused for every page read from disk
+        self.__page_buf = bytearray(page_size)
 
     @property
     def file(self): return self.__file
@@ -359,8 +576,9 @@ class PagingFile(object):
         if self.next_page() == 0:
             return INVALID_OFF
 
+        p = None
         while True:
-            p = self.read_page(root)
+            p = self.read_page_into(root, p)
             if p.pnum_parent == INVALID_OFF:
                 break
             root = p.pnum_parent
@@ -368,65 +586,182 @@ class PagingFile(object):
         return root
 
     def close(self):
+        self._write_dirty()
         self.__file.close()
 
     def flush(self):
+        self._write_dirty()
         self.__file.flush()
 
+    def truncate(self):
+        ''' Removes all pages of this file, including the ones cached '''
+        self.__cache.clear()
+        self.__dirty.clear()
+        self.__file.truncate(0)
+
+    @contextmanager
+    def batch(self):
+        ''' Context manager that defers writing pages to the file until the
+        (outermost) batch is exited. Until then, written pages are only kept as
+        dirty pages, so a page written multiple times is only written once, and
+        consecutive pages are written out together using a single pwritev. '''
+        self.__batch_depth += 1
+        try:
+            yield self
+        finally:
+            self.__batch_depth -= 1
+            if self.__batch_depth == 0:
+                self._write_dirty()
+
+    def _write_dirty(self):
+        ''' Writes out all dirty pages, sorted by page number, coalescing runs
+        of consecutive page numbers into one write '''
+        dirty = self.__dirty
+        if not dirty:
+            return
+
+        run = []
+        for pnum in sorted(dirty):
+            if run and (pnum != run[-1] + 1 or len(run) == IOV_MAX):
+                writevn(self.__fd, [dirty[n] for n in run],
+                        run[0] * self.__page_size)
+                run = []
+            run.append(pnum)
+        writevn(self.__fd, [dirty[n] for n in run], run[0] * self.__page_size)
+        dirty.clear()
+
+    def _get_cached(self, pagenum):
+        ''' Looks up a page in the page cache. A cached page object that has
+        since been moved to another page number (by changing its cur_pnum and
+        writing it back) no longer holds this page, so it is evicted, and
+        None is returned as if it was not cached. '''
+        page = self.__cache.get(pagenum)
+        if page is not None and page.cur_pnum != pagenum:
+            del self.__cache[pagenum]
+            return None
+        return page
+
+    def _cache_page(self, page):
+        cache = self.__cache
+        cache[page.cur_pnum] = page
+        cache.move_to_end(page.cur_pnum)
+        if len(cache) > self.__cache_size:
+            cache.popitem(last=False)
+
     def next_page(self):
-        sz = self.__file.seek(0, 2)
-        return (sz + self.__page_size - 1) // self.__page_size
+        sz = os.fstat(self.__fd).st_size
+        npages = (sz + self.__page_size - 1) // self.__page_size
+        if self.__dirty:
+            npages = max(npages, max(self.__dirty) + 1)
+        return npages
 
     def read_page(self, pagenum):
         ''' Reads a page from disk into memory, representing this page as a Page
-        object.
+        object. If the page is still in the page cache, the cached Page object
+        is returned as is. Note that this object is shared, so any changes made
+        to it should be written back with write_page.
         
         This will raise a FileFormatError whenever it detects some violation on
         the predefined file specifications vs what it reads from the actual
         underlying file on disk.'''
 
-        # Seek to the respective page.
-        f = self.__file
-        f.seek(pagenum * self.__page_size)
-
-        head_sz = s_page_header.size
-        
-        # Parse page header
-        page = readn(f, self.__page_size)
-        ptype, ncells, poff_start, pnum_right, pnum_parent = \
-                s_page_header.unpack_from(page)
-        if poff_start == 0:
-            poff_start = 0x10000
-
-        # File-format checking
-        if ptype not in _cells:
-            raise FileFormatError(f'Invalid page type: 0x{ptype:x}')
-
-        # Make sure our data chunks do not overlap
-        cell_off_end = head_sz + ncells * s_page_offs.size
-        if cell_off_end >= len(page):
-            raise FileFormatError(f'Invalid number of cells (0x{cell_off_end:x})')
-
-        if poff_start < cell_off_end:
-            raise FileFormatError(f'Invalid start offset (0x{poff_start:x})')
-
-        page_data = Page(self, pagenum, ptype, self.__tuple_types, pnum_right,
-                pnum_parent)
-
-        # Parse each cell
-        cells = []
-        offs = s_page_offs.iter_unpack(page[head_sz:cell_off_end])
-        prev_off = len(page)
-        for off, in offs:
-            if off < cell_off_end:
-                raise FileFormatError(f'Invalid cell offset (0x{off:x})')
-            cell, size = page_data.unpack_cell_from(page, off)
-            if off + size > prev_off:
-                raise FileFormatError(f'Overlapping cells or bad offset')
-            cells.append(cell)
-
-        page_data.cells = cells
-        return page_data
+        page = self._get_cached(pagenum)
+        if page is not None:
+            self.__cache.move_to_end(pagenum)
+            return page
+
+        page = self.read_page_into(pagenum, None)
+        self._cache_page(page)
+        return page
+
+    def read_page_into(self, pagenum, page):
+        ''' Reads a page from disk into an existing Page object of this file,
+        reusing that object instead of allocating a new one (a new one is only
+        created if page is None). The page object is returned.
+
+        This bypasses the page cache, so it is meant for scans that go through
+        many pages once, keeping just one Page around. Pages obtained from
+        read_page should not be passed here, since those are shared by the
+        cache. As with read_page, a FileFormatError is raised on any violation
+        of the file format. '''
+
+        if page is not None and page.dbfile is not self:
+            raise ValueError('Page does not belong to this file')
+
+        buf, hdr, offs = self._read_page_buf(pagenum)
+        if page is None:
+            page = Page(self, pagenum, hdr.ptype, self.__tuple_types,
+                    hdr.pnum_right, hdr.pnum_parent)
+        else:
+            page.reset(pagenum, hdr.ptype, hdr.pnum_right, hdr.pnum_parent)
+
+        cells, sizes = page.unpack_cells(buf, offs)
+        check_cell_extents(buf, offs, sizes)
+        page.cells.extend(cells)
+        return page
+
+    def read_page_column(self, pagenum, colind):
+        ''' Reads just one column (by its index into the tuple types) out of all
+        the tuples stored on a table leaf page. Only that column is unpacked from
+        each cell; none of the other values are unmarshalled, and no Page or
+        cell objects are built. If the page is in the page cache, the values are
+        taken from the cached cells instead.
+
+        This returns the right sibling page number of that page along with a
+        list of (rowid, value) pairs, in the order the cells are stored. '''
+
+        if not 0 <= colind < len(self.__tuple_types):
+            raise ValueError('Invalid column index')
+
+        page = self._get_cached(pagenum)
+        if page is not None:
+            if page.type != PageTypes.TableLeaf:
+                raise FileFormatError('Expected a table leaf page')
+            return page.pnum_right, [(c.rowid, c.tuples[colind])
+                    for c in page.cells]
+
+        buf, hdr, offs = self._read_page_buf(pagenum)
+        if hdr.ptype != PageTypes.TableLeaf:
+            raise FileFormatError('Expected a table leaf page')
+
+        # Each cell is validated just as TableLeafCell.load_payload does,
+        # except that the other columns are not unmarshalled
+        tuple_types = self.__tuple_types
+        unpack_head = TableLeafCell._head.unpack_from
+        cell_head_sz = TableLeafCell._head.size
+        column = []
+        sizes = []
+        for off in offs:
+            _, payload_size, rowid = unpack_head(buf, off)
+            start = off + cell_head_sz
+            if payload_size == 0 or start + payload_size > len(buf):
+                raise FileFormatError(f'Invalid payload size')
+
+            payload = buf[start:start + payload_size]
+            check_types_compat(tuple_types, bytes(payload[1:1 + payload[0]]))
+            column.append((rowid, vunpack_column(payload, colind, 0, True)))
+            sizes.append(cell_head_sz + payload_size)
+
+        check_cell_extents(buf, offs, sizes)
+        return hdr.pnum_right, column
+
+    def _read_page_buf(self, pagenum):
+        ''' Reads the raw contents of a page (from the dirty pages if it has not
+        been written out yet). This returns a memoryview over the page, the
+        parsed page header and the cell offsets, which are checked to not point
+        into the header. The view is only valid until the next page read. '''
+
+        buf = self.__dirty.get(pagenum)
+        if buf is None:
+            buf = self.__page_buf
+            readn_into(self.__fd, buf, pagenum * self.__page_size)
+        buf = memoryview(buf)
+        hdr = parse_page_header(buf)
+
+        offs = s_page_offsn(hdr.ncells).unpack_from(buf, s_page_header.size)
+        if offs and min(offs) < hdr.cell_off_end:
+            raise FileFormatError(f'Invalid cell offset (0x{min(offs):x})')
+        return buf, hdr, offs
 
     def write_page(self, page):
         ''' Writes a page back onto the backing file storage. 
@@ -444,36 +779,32 @@ class PagingFile(object):
 
         if page.cur_pnum == -1:
             page.cur_pnum = self.next_page()
+        page.invalidate_rowid_keys()
 
-        # Pack the cells
-        cells = [page.pack_cell(c) for c in page.cells]
-        if len(cells) >= 256:
+        ncells = len(page.cells)
+        if ncells >= 256:
             raise FileFormatError('Too many cells to pack')
 
-        # Determine offsets of cell within page block
+        # Pack the cells straight into the page data, laid out back to front
+        # from the end of the page, and never overlapping the cell offsets
+        s_offs = s_page_offsn(ncells)
+        head_sz = s_page_header.size
+        page_data = bytearray(self.__page_size)
         offs = []
         prev_off = self.__page_size
-        body = b''
-        for cell in cells:
-            prev_off -= len(cell)
-            body = cell + body
+        for cell in page.cells:
+            prev_off = page.pack_cell_into(cell, page_data,
+                    head_sz + s_offs.size, prev_off)
             offs.append(prev_off)
 
-        if prev_off <= 0:
-            raise FileFormatError('Overflow of cells')
-
-        # Piece together page data
-        page_head = s_page_header.pack(page.type, len(cells), prev_off,
+        s_page_header.pack_into(page_data, 0, page.type, ncells, prev_off,
                 page.pnum_right, page.pnum_parent)
-        page_head += struct.pack('>' + 'H' * len(offs), *offs)
-        if prev_off < len(page_head):
-            raise FileFormatError('Overflow of cells')
-
-        page_data = page_head + b'\0' * (prev_off - len(page_head)) + body
-        assert(len(page_data) == self.__page_size)
+        s_offs.pack_into(page_data, head_sz, *offs)
 
-        # Seek to the respective page and write
-        f = self.__file
-        f.seek(page.cur_pnum * self.__page_size)
-        f.write(page_data)
+        # Write to the respective page, or defer that if within a batch
+        if self.__batch_depth:
+            self.__dirty[page.cur_pnum] = page_data
+        else:
+            writen(self.__fd, page_data, page.cur_pnum * self.__page_size)
+        self._cache_page(page)
 
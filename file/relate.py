@@ -37,9 +37,14 @@ class Key(object):
     def __eq__(self, other): return compare(self.val, other.val, '=')
 
 def init_idx_with(idx, tbl, colind):
-    for tup in tbl:
-        rowid = tup[0]
-        idx.add(rowid, tup[colind])
+    if colind == 0:
+        for tup in tbl:
+            idx.add(tup[0], tup[0])
+        return
+
+    # Only the indexed column is needed, so avoid unpacking whole tuples
+    for rowid, val in tbl.iter_column(colind - 1):
+        idx.add(rowid, val)
 
 class MemoryIndex(object):
     ''' An ad-hoc memory index file for when an on-file index file does not
@@ -347,7 +352,8 @@ class RelationalDBFile(AbstractDBFile):
     def _modify(self, mod_colind, new_value, cond_colind, cond_value, cond='='):
         cond_value = self._typecast(self.__cols[cond_colind].dtype, cond_value)
         new_value = self._check_constraint(mod_colind, new_value)
-        for rowid in self._get_index(cond_colind).search(cond_value, cond):
+        rowids = list(self._get_index(cond_colind).search(cond_value, cond))
+        for rowid in rowids:
             tup = self.__tbl.select(rowid)
             if tup == None: continue
             if tup[cond_colind] == NULLVAL: # explicitly disallow nulls
@@ -357,18 +363,14 @@ class RelationalDBFile(AbstractDBFile):
             new_tup[mod_colind] = new_value
             new_rowid = self.__tbl.modify(rowid, new_tup[1:])
 
-            if new_rowid == rowid:
-                continue
-
-            # Update stuff
+            # Update stuff (the modified column's index needs updating even if
+            # the tuple was modified in place)
             for cind, idx in self._itr_loaded_index():
                 if cind == mod_colind:
                     # Delete from index, and re-insert
-                    idx = self._get_index(mod_colind, False)
-                    if idx != None:
-                        idx.delete(rowid, tup[mod_colind])
-                        idx.add(new_rowid, new_value)
-                else:
+                    idx.delete(rowid, tup[mod_colind])
+                    idx.add(new_rowid, new_value)
+                elif new_rowid != rowid:
                     idx.modify(rowid, new_rowid, tup[cind])
         
         return 0
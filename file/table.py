@@ -1,6 +1,7 @@
 from .base import FileFormatError, require_params
 from .paging import create_cell, Page, PageTypes as pt, PagingFile, \
-        INVALID_OFF, TableInteriorCell
+        INVALID_OFF, TableInteriorCell, batched
+from bisect import bisect_left, bisect_right
 from functools import lru_cache
 
 class TableInteriorRightCell(object):
@@ -69,6 +70,7 @@ class TableNode(object):
         if p.get_free_size() >= p.get_cell_size(cell):
             # Simply add the value
             cells.append(cell)
+            p.invalidate_rowid_keys()
             self.writeback()
             return rowid, None
 
@@ -99,6 +101,7 @@ class TableNode(object):
 
         if p.type == pt.TableLeaf:
             del p.cells[path] 
+            p.invalidate_rowid_keys()
             self.writeback()
             return True
 #            return True, p.get_used_size() < self.__minfill
@@ -116,6 +119,7 @@ class TableNode(object):
         # Update pivot
         if is_rm and path > 0:
             self.get_cell(path - 1).rowid = n_chld.get_min_rowid()
+            self.__page.invalidate_rowid_keys()
             self.writeback()
 
         return is_rm
@@ -209,18 +213,14 @@ class TableNode(object):
         '''
 
         p = self.__page
+        keys = p.rowid_keys()
         if p.type == pt.TableLeaf:
-            for i in range(len(p.cells)):
-                if rowid == p.cells[i].rowid:
-                    return i
-            else:
-                return -1
+            i = bisect_left(keys, rowid)
+            if i < len(keys) and keys[i] == rowid:
+                return i
+            return -1
         else:
-            for i in range(len(p.cells)):
-                if rowid < p.cells[i].rowid:
-                    return i
-            else:
-                return len(p.cells)
+            return bisect_right(keys, rowid)
 
     def get_min_rowid(self):
         p = self.__page
@@ -320,6 +320,25 @@ class TableFile(PagingFile):
                 break
             n = self._fetch_node(n.page.pnum_right)
 
+    def iter_column(self, colind):
+        ''' This will return an iterator that goes through just one column (by
+        its index into the tuple types) of this table in increasing monotonic
+        order of rowid. Each element is a 2-tuple of rowid and that column's
+        value. Unlike iterating over the whole table, only that column is
+        unpacked from each tuple on the leaf pages.'''
+
+        if self.__root == None:
+            return
+
+        n = self.__root
+        while n.page.type != pt.TableLeaf:
+            n = self._fetch_node(n.get_cell(0).left_child)
+
+        pnum = n.page.cur_pnum
+        while pnum != INVALID_OFF:
+            pnum, column = self.read_page_column(pnum, colind)
+            yield from column
+
     def dirty_props(self):
         ''' Queries and clears any table properties that might be dirty after
         modifying some internal state of the table. This function will return a
@@ -347,6 +366,7 @@ class TableFile(PagingFile):
         self.__dirty.add('last_rowid')
         return self.__lastrowid
 
+    @batched
     def add(self, tupleVal):
         ''' Adds an tuple into this table. This function returns the rowid of
         the newly added item. The table's last rowid and root page might be
@@ -379,10 +399,11 @@ class TableFile(PagingFile):
 
     def clear(self):
         TableFile._fetch_node.cache_clear()
-        self.file.truncate(0)
+        self.truncate()
         self.__root = None
         self.__dirty.add('root_page')
 
+    @batched
     def delete(self, rowid):
         if self.__root == None:
             return False
@@ -393,6 +414,7 @@ class TableFile(PagingFile):
             return None
         return self.__root.select(rowid)
 
+    @batched
     def modify(self, rowid, tupleVal):
         ''' Modifies the rowid to have the new tupleVal. If the tupleVal would
         cause an overflow in the page that it is in, this will remove the rowid
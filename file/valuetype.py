@@ -20,13 +20,15 @@ as needed (primitive or extended primitive)
 '''
 
 __all__ = ['Date', 'DateTime', 'Time', 'DBData', 'ValueType', 'Year',
-        'check_type_compat', 'parse_from_int', 'parse_from_str', 'vpack',
+        'check_type_compat', 'check_types_compat', 'parse_from_int', 'parse_from_str', 'vpack',
         'vpack1', 'vunpack', 'vunpack1', 'vunpack_from', 'vunpack1_from', 
+        'vunpack_column',
         'NULLVAL']
 
 import enum
 import datetime
 import struct
+from functools import lru_cache
 
 from .base import FileFormatError
 
@@ -336,6 +338,72 @@ def check_type_compat(expected, actual):
     if expected in __type_map: n_expected = __type_map[expected][0].name
     raise FileFormatError(f'type {n_actual} not compatible with type {n_expected}')
 
+# Number of distinct typeid signatures whose codecs are kept around. Since a
+# TEXT typeid encodes the length of the text, a table can have many signatures,
+# so only the most recently used ones are kept.
+CODEC_CACHE_SIZE = 1024
+
+# Maps each typeid to the lowest typeid of its type (e.g. every TEXT length to
+# TEXT), as a translation table for bytes.translate. Invalid typeids are kept.
+_base_typeids = bytes(__type_map[i][0] if i in __type_map else i
+        for i in range(MAX_TYPE + 1))
+
+def check_types_compat(expected, actual):
+    ''' Checks a whole tuple of actual typeids (usually the raw typeid bytes of a
+    packed tuple) against the tuple of expected types. The actual typeids are
+    first reduced to their base types, so that the result can be cached per
+    combination of types (rather than per TEXT length), and a check for an
+    already seen combination is a single lookup. The expected types must be a
+    tuple, and the actual typeids bytes.'''
+    _check_base_types_compat(expected, actual.translate(_base_typeids))
+
+@lru_cache(CODEC_CACHE_SIZE)
+def _check_base_types_compat(expected, actual):
+    if len(expected) != len(actual):
+        raise FileFormatError('Mismatch tuple sizes')
+    for exp, act in zip(expected, actual):
+        check_type_compat(exp, act)
+
+@lru_cache(CODEC_CACHE_SIZE)
+def _tuple_codec(typeids):
+    ''' Compiles the struct and the list of value types needed to marshall a
+    tuple with the given (exact) typeid signature, given as bytes. These are
+    cached by signature, so that the format does not have to be rebuilt for
+    every tuple with a recently seen signature.'''
+
+    full_fmt = '>B' + 'B' * len(typeids)
+    dtypes = []
+    for typeid in typeids:
+        _, _, fmt, dtype = __type_map[typeid] # Should't cause error
+        full_fmt += fmt
+        dtypes.append(dtype)
+
+    return struct.Struct(full_fmt), tuple(dtypes)
+
+@lru_cache(MAX_TYPE + 1)
+def _value_codec(typeid):
+    ''' Same as _tuple_codec, but for a single value without any header '''
+
+    _, _, fmt, dtype = __type_map[typeid] # Should't cause error
+    return struct.Struct('>' + fmt), dtype
+
+@lru_cache(CODEC_CACHE_SIZE)
+def _column_codec(typeids, colind):
+    ''' Computes where a single column lives within a packed tuple with the
+    given (exact) typeid signature, by summing up the sizes of all values
+    before it. Returns the offset of that column's value (relative to the start
+    of the tuple), the total size of the tuple, and the struct and value type
+    needed to unmarshall that column.'''
+
+    sizes = [__type_map[typeid][1] for typeid in typeids] # Should't cause error
+    offset = 1 + len(typeids) + sum(sizes[:colind])
+    _, _, fmt, dtype = __type_map[typeids[colind]]
+    return offset, 1 + len(typeids) + sum(sizes), struct.Struct('>' + fmt), dtype
+
+def _check_buffer(data):
+    if not isinstance(data, (bytes, bytearray, memoryview)):
+        raise FileFormatError('Expected data to be a bytes-like buffer')
+
 def vpack(typeids, *data):
     ''' Packs some data, given its typeids, into a marshalled, packed tuple,
     that includes number of items in tuple and typeid's. This returns a stream
@@ -347,12 +415,11 @@ def vpack(typeids, *data):
     if len(typeids) != len(data):
         raise FileFormatError(f'Expected {len(typeids)} data points, only got {len(data)} data points')
 
-    full_fmt = '>B' + 'B' * len(typeids)
     for typeid, data in zip(typeids, data):
         if typeid not in __type_map:
             raise FileFormatError(f'Invalid type-id: 0x{typeid:x}')
 
-        typeid, _, fmt, dtype = __type_map[typeid]
+        typeid, _, _, dtype = __type_map[typeid]
 
         # Check data-type of data
         if type(data) != dtype:
@@ -368,14 +435,12 @@ def vpack(typeids, *data):
             typeid = ValueType.TEXT + len(data)
             if typeid > MAX_TYPE:
                 raise FileFormatError('Text is too long.')
-            _, _, fmt, dtype = __type_map[typeid]
 
         typeids2.append(typeid)
-        if fmt:
-            data2.append(data)
-            full_fmt += fmt
+        data2.append(data)
 
-    return struct.pack(full_fmt, len(typeids), *(typeids2 + data2)) 
+    fmt, _ = _tuple_codec(bytes(typeids2))
+    return fmt.pack(len(typeids), *typeids2, *data2)
 
 def vpack1(typeid, data):
     ''' Packs a single data point, given its typeids, into a marshalled, packed
@@ -394,41 +459,29 @@ def vunpack_from(data, offset=0, exact=False):
     ''' Unpacks an marshalled tuple data with unknown types from some buffer.
     This will return a list of data points that has been unpacked and
     unmarshalled. Data must be AT LEAST the size of the tuple. On return, it
-    will return a tuple of the element tuple and total size in bytes. '''
+    will return a tuple of the element tuple and total size in bytes. 
+    
+    The data can be any bytes-like buffer, including a memoryview into a larger
+    page, in which case the values are unpacked in place without copying. '''
 
-    if type(data) is not bytes:
-        raise FileFormatError('Expected data to be of type bytes')
+    _check_buffer(data)
 
-    if len(data) == 0:
+    if len(data) <= offset:
         raise FileFormatError('Short read in unpack')
 
-    cols = data[0]
-    col_types = struct.unpack_from('>x' + 'B' * cols, data, offset)
-
+    cols = data[offset]
     if offset + cols + 1 > len(data):
         raise FileFormatError('Short read in unpack')
 
-    full_fmt = '>' + 'x' * (cols + 1)
-    dtypes = []
-    for typeid in col_types:
-        _, size, fmt, dtype = __type_map[typeid] # Should't cause error
-        full_fmt += fmt
-        dtypes.append(dtype)
-
-    fmt = struct.Struct(full_fmt)
+    fmt, dtypes = _tuple_codec(bytes(data[offset + 1:offset + cols + 1]))
     if offset + fmt.size > len(data):
         raise FileFormatError('Short read in unpack')
     elif exact and offset + fmt.size != len(data):
         raise FileFormatError('Not exact unpack')
 
-    datas = list(struct.unpack_from(full_fmt, data, offset))
-    for ind, data in enumerate(datas):
-        dtype = dtypes[ind]
-        if dtype != type(data):
-            data = dtype.decode(data)
-        datas[ind] = data
-
-    return (tuple(datas), fmt.size)
+    datas = fmt.unpack_from(data, offset)[cols + 1:]
+    return (tuple(val if type(val) is dtype else dtype.decode(val)
+        for val, dtype in zip(datas, dtypes)), fmt.size)
 
 def vunpack1_from(data, offset=0):
     ''' Unpacks one data point from an offset (without a header for number of
@@ -436,17 +489,54 @@ def vunpack1_from(data, offset=0):
     actual value, not a 1-tuple. Size of data must be at least the size of the
     data type and the typeid byte'''
 
-    data2 = data[offset:]
-    tup, size = vunpack_from(b'\x01' + data2)
-    return tup[0], size - 1
+    _check_buffer(data)
+    if len(data) <= offset:
+        raise FileFormatError('Short read in unpack')
+
+    fmt, dtype = _value_codec(data[offset])
+    if offset + 1 + fmt.size > len(data):
+        raise FileFormatError('Short read in unpack')
+
+    val, = fmt.unpack_from(data, offset + 1)
+    if type(val) is not dtype:
+        val = dtype.decode(val)
+    return val, fmt.size + 1
+
+def vunpack_column(data, colind, offset=0, exact=False):
+    ''' Unpacks only a single column (by its index) out of a marshalled tuple
+    at some offset in a buffer, and returns just that unmarshalled value. All
+    the other values in that tuple are skipped over without being unpacked or
+    unmarshalled. Data must be AT LEAST the size of the tuple (or exactly, if
+    exact is set, as with vunpack_from).'''
+
+    _check_buffer(data)
+    if len(data) <= offset:
+        raise FileFormatError('Short read in unpack')
+
+    cols = data[offset]
+    if not 0 <= colind < cols:
+        raise FileFormatError('Invalid column index')
+    elif offset + cols + 1 > len(data):
+        raise FileFormatError('Short read in unpack')
+
+    coloff, size, fmt, dtype = _column_codec(
+            bytes(data[offset + 1:offset + cols + 1]), colind)
+    if offset + size > len(data):
+        raise FileFormatError('Short read in unpack')
+    elif exact and offset + size != len(data):
+        raise FileFormatError('Not exact unpack')
+
+    val, = fmt.unpack_from(data, offset + coloff)
+    if type(val) is not dtype:
+        val = dtype.decode(val)
+    return val
 
 def vunpack1(data):
     ''' Unpacks one data point (without a header for number of columns).
     Otherwise this does exactly the same as vunpack, but returns the actual
     value, not a 1-tuple'''
 
-    if type(data) is not bytes:
-        raise FileFormatError('Expected data to be of type bytes')
+    _check_buffer(data)
     return vunpack(b'\x01' + data)[0]
 
 